@@ -1,5 +1,10 @@
 from .bet import Bet, BetType
 from .bookmaker import Bookmaker
 from .event import Event
-from .utils import (american_to_decimal, decimal_to_american,
-                    decimal_to_fractional, fractional_to_decimal)
+from .feed import FeedMetrics, FeedPipeline
+from .hedge import Hedge, hedge_event, hedge_events
+from .odds_index import BestOddsIndex
+from .prune import PrunedEvent, prune_event
+from .utils import (american_to_decimal, commission_adjusted_odds,
+                    decimal_to_american, decimal_to_fractional,
+                    fractional_to_decimal)
@@ -0,0 +1,221 @@
+"""Validates, normalises and optionally submits event payloads in bulk.
+
+Usage:
+    python -m betting_event events/ day.ndjson -o results.ndjson
+    cat day.ndjson | python -m betting_event - --endpoint http://localhost:8000/MultiMarket
+
+Inputs are `.json` files holding one event, NDJSON files (any other extension) holding one
+event per line, directories (searched for `.json`, `.ndjson` and `.jsonl` files) or `-` for
+NDJSON on stdin. One NDJSON line is written per event, in input order:
+    {"source": ..., "line": ..., "event": {...}}  or  {"source": ..., "line": ..., "error": "..."}
+"""
+import argparse
+import collections
+import concurrent.futures
+import json
+import os
+import sys
+import time
+import typing
+import urllib.parse
+import urllib.request
+
+from .event import Event
+from .prune import prune_event
+from .utils import american_to_decimal, fractional_to_decimal
+
+ODDS_FORMATS = ("auto", "decimal", "fractional", "american")
+DIRECTORY_SUFFIXES = (".json", ".ndjson", ".jsonl")
+RAPIDAPI_ENDPOINT = "https://multi-market-calculator.p.rapidapi.com/MultiMarket"
+
+TASK_T = typing.Tuple[str, int, str]
+
+
+def normalise_odds(odds: typing.Union[str, int, float], odds_format: str = "auto") -> float:
+    """Converts odds to decimal odds.
+
+    Args:
+        odds (str | int | float): The odds to convert.
+        odds_format (str): One of `ODDS_FORMATS`. With `auto`, strings containing `/` are read as
+        fractional odds, strings starting with `+` or `-` as American odds and anything else as
+        decimal odds. Defaults to `auto`.
+
+    Returns:
+        float: The decimal odds.
+    """
+    if odds_format == "auto":
+        if isinstance(odds, str) and "/" in odds:
+            odds_format = "fractional"
+        elif isinstance(odds, str) and odds.strip()[:1] in ("+", "-"):
+            odds_format = "american"
+        else:
+            odds_format = "decimal"
+
+    if odds_format == "fractional":
+        return fractional_to_decimal(str(odds).strip())
+    if odds_format == "american":
+        return american_to_decimal(int(float(odds)))
+    return float(odds)
+
+
+def submit(event: Event, endpoint: str, api_key: typing.Optional[str] = None, timeout: typing.Optional[float] = None) -> Event:
+    """Sends an event to a calculator endpoint and updates it with the returned wagers. Unlike
+    `Event.send_to_RapidAPI`, an error response raises `urllib.error.HTTPError` rather than
+    printing it and leaving the event unchanged.
+
+    Args:
+        event (Event): The event to send.
+        endpoint (str): The calculator URL, e.g. `RAPIDAPI_ENDPOINT`.
+        api_key (str | None): Sent as the `X-RapidAPI-Key` header, along with the endpoint's host
+        as `X-RapidAPI-Host`, if given.
+        timeout (float | None): Seconds to wait for the endpoint before raising. Defaults to None
+        (wait forever).
+
+    Returns:
+        Event: The event with the wagers updated.
+    """
+    headers = {"content-type": "application/json"}
+    if api_key is not None:
+        headers["X-RapidAPI-Key"] = api_key
+        headers["X-RapidAPI-Host"] = urllib.parse.urlsplit(endpoint).netloc
+    request = urllib.request.Request(endpoint, json.dumps(event.as_dict()).encode(), headers, method="POST")
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        updated_event = Event.from_dict(json.loads(response.read()))
+
+    with event.batch():
+        for updated_bet in updated_event.bets:
+            event.add_bet(updated_bet)
+        event.profit = updated_event.profit
+
+    return event
+
+
+def process(task: TASK_T, options: argparse.Namespace) -> typing.Tuple[str, typing.Optional[str]]:
+    """Processes one event payload.
+
+    Returns:
+        tuple[str, str | None]: The output line, and the name of the error raised, if any.
+    """
+    source, line, payload = task
+    result: typing.Dict[str, typing.Any] = {"source": source, "line": line}
+    try:
+        event_dict = json.loads(payload)
+        for bet_dict in event_dict.get("bets", []):
+            if "odds" in bet_dict:
+                bet_dict["odds"] = normalise_odds(bet_dict["odds"], options.odds_format)
+        event = Event.from_dict(event_dict)
+
+        if options.prune:
+            event = prune_event(event).event
+
+        endpoint = options.endpoint
+        if endpoint is None and options.api_key is not None:
+            endpoint = RAPIDAPI_ENDPOINT
+        if endpoint is not None:
+            submit(event, endpoint, options.api_key, options.timeout)
+
+        result["event"] = event.as_dict(wagers_only=options.wagers_only)
+    except Exception as error:
+        result["error"] = f"{type(error).__name__}: {error}"
+        return json.dumps(result), type(error).__name__
+
+    return json.dumps(result), None
+
+
+def read_tasks(paths: typing.Iterable[str], exclude: typing.Optional[str] = None) -> typing.Iterator[TASK_T]:
+    """Yields (source, line number, payload) for every event in the given inputs.
+
+    Args:
+        paths (Iterable[str]): Files, directories, or `-` for stdin.
+        exclude (str | None): A file to skip, e.g. the output file, so it is never read back.
+    """
+    exclude = None if exclude is None else os.path.realpath(exclude)
+    for path in paths:
+        if path != "-" and os.path.realpath(path) == exclude:
+            continue
+        if path == "-":
+            yield from _read_lines("<stdin>", sys.stdin)
+        elif os.path.isdir(path):
+            for root, directories, files in os.walk(path):
+                directories.sort()
+                for name in sorted(files):
+                    if name.endswith(DIRECTORY_SUFFIXES):
+                        yield from read_tasks([os.path.join(root, name)], exclude)
+        elif path.endswith(".json"):
+            with open(path, "r") as file:
+                yield path, 1, file.read()
+        else:
+            with open(path, "r") as file:
+                yield from _read_lines(path, file)
+
+
+def _read_lines(source: str, lines: typing.Iterable[str]) -> typing.Iterator[TASK_T]:
+    for line_number, line in enumerate(lines, 1):
+        if line.strip():
+            yield source, line_number, line
+
+
+def run(tasks: typing.Iterable[TASK_T], options: argparse.Namespace) -> typing.Iterator[typing.Tuple[str, typing.Optional[str]]]:
+    """Processes tasks across `options.workers` processes, yielding results in input order.
+    At most `options.window` tasks are held in memory at once."""
+    if options.workers <= 1:
+        for task in tasks:
+            yield process(task, options)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(options.workers) as executor:
+        pending: typing.Deque[concurrent.futures.Future] = collections.deque()
+        for task in tasks:
+            pending.append(executor.submit(process, task, options))
+            if len(pending) >= options.window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m betting_event", description=__doc__.split("\n")[0])
+    parser.add_argument("inputs", nargs="+", help="Event files, directories, or - for NDJSON on stdin.")
+    parser.add_argument("-o", "--output", default="-", help="File to write NDJSON results to. Defaults to stdout.")
+    parser.add_argument("--odds-format", choices=ODDS_FORMATS, default="auto", help="Format of the bet odds in the inputs.")
+    parser.add_argument("--prune", action="store_true", help="Remove bets that cannot receive a wager from the event before submitting and output.")
+    parser.add_argument("--endpoint", help="Calculator URL to submit each event to, e.g. a local stand-in.")
+    parser.add_argument("--api-key", help="RapidAPI key. Without --endpoint, events are submitted to RapidAPI.")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for the calculator to respond. Defaults to 60.")
+    parser.add_argument("--wagers-only", action="store_true", help="Only output bets with a wager.")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="Number of worker processes.")
+    parser.add_argument("--window", type=int, default=None, help="Maximum events in flight. Defaults to 64 per worker.")
+    options = parser.parse_args(argv)
+    if options.window is None:
+        options.window = 64 * options.workers
+
+    exclude = None
+    if options.output != "-":
+        exclude = os.path.realpath(options.output)
+        if exclude in (os.path.realpath(path) for path in options.inputs if path != "-"):
+            parser.error(f"output file {options.output} is also an input")
+
+    output = sys.stdout if options.output == "-" else open(options.output, "w")
+    processed, errors = 0, collections.Counter()
+    started = time.perf_counter()
+    try:
+        for line, error in run(read_tasks(options.inputs, exclude), options):
+            output.write(line + "\n")
+            processed += 1
+            if error is not None:
+                errors[error] += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"{processed} events in {elapsed:.2f}s ({processed / elapsed if elapsed else 0:.0f} events/s), "
+          f"{sum(errors.values())} errors", file=sys.stderr)
+    for error, count in errors.most_common():
+        print(f"  {error}: {count}", file=sys.stderr)
+
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
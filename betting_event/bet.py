@@ -1,10 +1,12 @@
 import enum
 import json
+import math
 import re
 import typing
 from os.path import dirname, join
 
 from .bookmaker import Bookmaker
+from .utils import commission_adjusted_odds
 
 BET_T = typing.TypeVar('BET_T', bound='Bet')
 
@@ -121,6 +123,7 @@ ValueCheck: typing.Dict[BetType, typing.Tuple[typing.Pattern, str, typing.List[s
 
 class Bet:
     DefaultBookmaker = Bookmaker()
+    _EFFECTIVE_ODDS_INPUTS = ("odds", "lay", "bookmaker")
 
     def __init__(self,
                  bet_type: typing.Union[BetType, str, int],
@@ -164,6 +167,46 @@ class Bet:
                 f"{self.bet_type.name} ({self.bet_type.value}).\nExpected regex format: " + 
                 f"'{ValueCheck[self.bet_type][0].pattern}'\n{ValueCheck[self.bet_type][1]}\"")
 
+    def __setattr__(self, __name: str, __value: typing.Any) -> None:
+        if not __name.startswith("_"):
+            self.__dict__["_as_dict"] = None
+        if __name in self._EFFECTIVE_ODDS_INPUTS:
+            self.__dict__["_effective"] = None
+        super().__setattr__(__name, __value)
+
+    def _effective_values(self) -> typing.Tuple[float, float, float, float]:
+        """Returns (commission, effective odds, effective lay odds, implied probability),
+        recalculating them if the odds, lay flag or bookmaker changed since they were cached, or
+        the bookmaker's commission did."""
+        commission = self.bookmaker.commission
+        cached = self.__dict__.get("_effective")
+        if cached is None or cached[0] != commission:
+            effective_odds = commission_adjusted_odds(self.odds, commission, self.lay)  # NaN for invalid odds
+            effective_lay_odds = 1 + 1 / (effective_odds - 1) if effective_odds != 1 else math.inf
+            implied_probability = 1 - 1 / effective_odds if self.lay else 1 / effective_odds
+            cached = self.__dict__["_effective"] = (commission, effective_odds, effective_lay_odds, implied_probability)
+        return cached
+
+    @property
+    def effective_odds(self) -> float:
+        """The decimal odds after the bookmaker's commission, as back odds. For lay bets, the back
+        odds that return the same profit for the same liability. NaN if the odds are 1.0 or lower."""
+        return self._effective_values()[1]
+
+    @property
+    def effective_lay_odds(self) -> float:
+        """The decimal odds after the bookmaker's commission, as lay odds. For lay bets, the lay
+        odds without commission that return the same profit for the same liability. For back
+        bets, the lay odds that return the same profit for the same risk. NaN if the odds are
+        1.0 or lower."""
+        return self._effective_values()[2]
+
+    @property
+    def implied_probability(self) -> float:
+        """The probability of the bet's selection winning implied by its commission adjusted odds.
+        NaN if the odds are 1.0 or lower."""
+        return self._effective_values()[3]
+
     def __eq__(self, __new_bet: object) -> bool:
         if not isinstance(__new_bet, Bet):
             raise NotImplementedError
@@ -176,18 +219,27 @@ class Bet:
         Returns:
             dict: This bet represented as a dictionary.
         """
-        defaults_removed_dict = {}
-        for default_key, default_value in DEFAULTS.items():
-            current_value = getattr(self, default_key)
-            if isinstance(current_value, Bookmaker):
-                current_value = current_value._id
-            if current_value != default_value:
-                defaults_removed_dict[default_key] = current_value
-
-        return {
-            **{"bet_type": self.bet_type.name, "value": self.value, "odds": self.odds},
-            **defaults_removed_dict
-        }
+        return dict(self._cached_dict())
+
+    def _cached_dict(self) -> dict:
+        """Returns the cached `as_dict` result, rebuilding it if any attribute or the bookmaker's
+        id changed since. The returned dictionary must not be modified."""
+        bookmaker_id = self.bookmaker._id if isinstance(self.bookmaker, Bookmaker) else self.bookmaker
+        cached = self.__dict__.get("_as_dict")
+        if cached is None or cached[0] != bookmaker_id:
+            defaults_removed_dict = {}
+            for default_key, default_value in DEFAULTS.items():
+                current_value = getattr(self, default_key)
+                if isinstance(current_value, Bookmaker):
+                    current_value = current_value._id
+                if current_value != default_value:
+                    defaults_removed_dict[default_key] = current_value
+
+            cached = self.__dict__["_as_dict"] = (bookmaker_id, {
+                **{"bet_type": self.bet_type.name, "value": self.value, "odds": self.odds},
+                **defaults_removed_dict
+            })
+        return cached[1]
 
     @classmethod
     def from_dict(cls: typing.Type[BET_T], __bet_dict: dict) -> BET_T:
@@ -33,19 +33,31 @@ class Bookmaker:
 
         self._id = next(self.__ID_COUNTER)
 
+    def __setattr__(self, __name: str, __value: typing.Any) -> None:
+        self.__dict__["_as_dict"] = None
+        super().__setattr__(__name, __value)
+
     def as_dict(self) -> typing.Dict[str, typing.Union[float, int, bool]]:
         """Returns the bookmaker as a dictionary.
 
         Returns:
             dict: The bookmaker as a dictionary.
         """
-        result = {}
-        for key in DEFAULTS.keys():
-            current_value = getattr(self, key)
-            if current_value != DEFAULTS[key]:
-                result[key] = getattr(self, key)
+        return dict(self._cached_dict())
+
+    def _cached_dict(self) -> typing.Dict[str, typing.Union[float, int, bool]]:
+        """Returns the cached `as_dict` result, rebuilding it if any attribute changed since. The
+        returned dictionary must not be modified."""
+        cached = self.__dict__.get("_as_dict")
+        if cached is None:
+            result = {}
+            for key in DEFAULTS.keys():
+                current_value = getattr(self, key)
+                if current_value != DEFAULTS[key]:
+                    result[key] = getattr(self, key)
 
-        return {**result, **{"id": self._id}}
+            cached = self.__dict__["_as_dict"] = {**result, **{"id": self._id}}
+        return cached
 
     @classmethod
     def from_dict(cls: typing.Type[BOOKMAKER_T], __bookmaker_dict: dict) -> BOOKMAKER_T:
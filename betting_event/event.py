@@ -1,5 +1,9 @@
+import contextlib
 import http.client
 import json
+import math
+import threading
+from array import array
 from time import sleep
 import typing
 from os.path import dirname, join
@@ -12,6 +16,18 @@ EVENT_T = typing.TypeVar('EVENT_T', bound='Event')
 DEFAULTS: dict = json.load(open(join(dirname(__file__), "defaults.json"), "r"))["event"]
 DEFAULTS["profit"] = tuple(DEFAULTS["profit"])
 
+
+class _Snapshot(typing.NamedTuple):
+    """A copy of an event's state between batches, read by `as_dict` and `effective_odds`.
+    Nothing in it is modified once it is built."""
+    attributes: typing.Dict[str, typing.Any]            # event attributes that differ from DEFAULTS
+    bookmakers: typing.Tuple[dict, ...]
+    bets: typing.Tuple[typing.Tuple[float, dict], ...]  # (wager, bet dictionary)
+    effective_odds: array
+    effective_lay_odds: array
+    implied_probabilities: array
+
+
 class Event:
     _BOOKMAKER_CLASS = Bookmaker
     _BET_CLASS = Bet
@@ -39,6 +55,75 @@ class Event:
         self.bets: typing.List[BET_T] = bets
         self.bookmakers: typing.List[BOOKMAKER_T] = bookmakers
 
+        self._lock = threading.RLock()
+        self._writers = 0   # batches the lock holder has open
+        self._snapshot: typing.Optional[_Snapshot] = None
+
+    def __getstate__(self) -> typing.Dict[str, typing.Any]:
+        with self._lock:
+            state = dict(self.__dict__)
+        for key in ("_lock", "_writers", "_snapshot"):  # locks can't be pickled, and copies must not share them
+            del state[key]
+        return state
+
+    def __setstate__(self, state: typing.Dict[str, typing.Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+        self._writers = 0
+        self._snapshot = None
+
+    def _take_snapshot(self) -> _Snapshot:
+        """Copies the current state. Must be called holding the lock."""
+        effective_values = [bet._effective_values() if isinstance(bet.bookmaker, Bookmaker) else (0.0, math.nan, math.nan, math.nan)
+                            for bet in self.bets]
+        return _Snapshot(
+            {key: getattr(self, key) for key, default in DEFAULTS.items()
+             if key not in ("bookmakers", "bets") and getattr(self, key) != default},
+            tuple(bookmaker._cached_dict() for bookmaker in self.bookmakers),
+            tuple((bet.wager, bet._cached_dict()) for bet in self.bets),
+            array('d', [values[1] for values in effective_values]),
+            array('d', [values[2] for values in effective_values]),
+            array('d', [values[3] for values in effective_values]))
+
+    def _read(self) -> _Snapshot:
+        """Returns the state for a reader. While another thread is inside a batch, that is the
+        state published when the last batch finished, so readers never wait for writers."""
+        if not self._lock.acquire(blocking=self._snapshot is None):
+            return self._snapshot   # type: ignore
+        try:
+            # Rebuilt rather than reused, so bets and bookmakers changed outside a batch show up.
+            snapshot = self._take_snapshot()
+            if not self._writers:   # this thread is not part way through its own batch
+                self._snapshot = snapshot
+            return snapshot
+        finally:
+            self._lock.release()
+
+    @contextlib.contextmanager
+    def batch(self: EVENT_T) -> typing.Iterator[EVENT_T]:
+        """Holds this event's lock for the duration of a `with` block, so a group of updates is
+        applied atomically. Other writers (e.g. `add_bet`, `add_bets`) wait until the block
+        exits. Readers (`as_dict`, `effective_odds`) don't wait: they are served a snapshot of the
+        event taken when the last batch finished, so they never see a half-applied batch. Each
+        event has its own lock, so threads working on different events do not block each other.
+
+        Example:
+            with event.batch():
+                event.add_bets(bets)
+                event.profit = profit
+
+        Returns:
+            Event: This event object.
+        """
+        with self._lock:
+            self._writers += 1
+            try:
+                yield self
+            finally:
+                self._writers -= 1
+                if not self._writers and self._snapshot is not None:    # only kept up once read
+                    self._snapshot = self._take_snapshot()
+
     def add_bookmaker(self: EVENT_T, bookmaker) -> EVENT_T:
         """Adds a bookmaker to the event. If the bookmaker already exists, it will be updated.
 
@@ -48,17 +133,19 @@ class Event:
         Returns:
             Event: This event object.
         """
+        with self.batch():
+            try:
+                index = self.bookmakers.index(bookmaker)
 
-        try:
-            index = self.bookmakers.index(bookmaker)
-
-        except ValueError:
-            self.bookmakers.append(bookmaker)
+            except ValueError:
+                self.bookmakers.append(bookmaker)
 
-        else:
-            for attribute in bookmaker.__dict__:
-                if getattr(self.bookmakers[index], attribute) != getattr(bookmaker, attribute):
-                    setattr(self.bookmakers[index], attribute, getattr(bookmaker, attribute))
+            else:
+                for attribute in bookmaker.__dict__:
+                    if attribute.startswith("_"):
+                        continue
+                    if getattr(self.bookmakers[index], attribute) != getattr(bookmaker, attribute):
+                        setattr(self.bookmakers[index], attribute, getattr(bookmaker, attribute))
 
         return self
 
@@ -71,42 +158,7 @@ class Event:
         Returns:
             Event: This event object.
         """
-        # if isinstance(bet.bookmaker, int):
-        if not issubclass(type(bet.bookmaker), Bookmaker):
-            for bookmaker in self.bookmakers:
-                if bookmaker._id == bet.bookmaker:
-                    bet.bookmaker = bookmaker
-                    break
-            else:
-                bet.bookmaker = bet.DefaultBookmaker
-
-        try:
-            index = self.bets.index(bet)
-        except ValueError:
-            if bet.bookmaker not in self.bookmakers:
-                self.add_bookmaker(bet.bookmaker)
-            self.bets.append(bet)
-        else:
-            for attribute in bet.__dict__:
-                if attribute == "previous_wager":
-                    bet.previous_wager += self.bets[index].wager
-                if getattr(self.bets[index], attribute) != getattr(bet, attribute):
-                    setattr(self.bets[index], attribute, getattr(bet, attribute))
-
-        return self
-    
-    def add_bets(self: EVENT_T, bets: typing.List[BET_T]) -> EVENT_T:
-        """Adds multiple bets to the event. Faster that adding them individually.
-
-        Args:
-            bets (list[Bet]): The bets to add.
-
-        Returns:
-            Event: This event object.
-        """
-
-        for bet in bets[::-1]:
-
+        with self.batch():
             # if isinstance(bet.bookmaker, int):
             if not issubclass(type(bet.bookmaker), Bookmaker):
                 for bookmaker in self.bookmakers:
@@ -116,38 +168,91 @@ class Event:
                 else:
                     bet.bookmaker = bet.DefaultBookmaker
 
-            if bet.bookmaker not in self.bookmakers:
-                self.add_bookmaker(bet.bookmaker)
-
-            if bet in self.bets:
+            try:
                 index = self.bets.index(bet)
+            except ValueError:
+                if bet.bookmaker not in self.bookmakers:
+                    self.add_bookmaker(bet.bookmaker)
+                self.bets.append(bet)
+            else:
                 for attribute in bet.__dict__:
+                    if attribute.startswith("_"):
+                        continue
                     if attribute == "previous_wager":
                         bet.previous_wager += self.bets[index].wager
                     if getattr(self.bets[index], attribute) != getattr(bet, attribute):
                         setattr(self.bets[index], attribute, getattr(bet, attribute))
-                bets.remove(bet)
 
-        self.bets.extend(bets)
+        return self
+    
+    def add_bets(self: EVENT_T, bets: typing.List[BET_T]) -> EVENT_T:
+        """Adds multiple bets to the event. Faster that adding them individually. The bets are
+        applied atomically, other threads never see only some of them added.
+
+        Args:
+            bets (list[Bet]): The bets to add. The list itself is not modified.
+
+        Returns:
+            Event: This event object.
+        """
+        new_bets = []
+
+        with self.batch():
+            for bet in bets:
+
+                # if isinstance(bet.bookmaker, int):
+                if not issubclass(type(bet.bookmaker), Bookmaker):
+                    for bookmaker in self.bookmakers:
+                        if bookmaker._id == bet.bookmaker:
+                            bet.bookmaker = bookmaker
+                            break
+                    else:
+                        bet.bookmaker = bet.DefaultBookmaker
+
+                if bet.bookmaker not in self.bookmakers:
+                    self.add_bookmaker(bet.bookmaker)
+
+                if bet in self.bets:
+                    index = self.bets.index(bet)
+                    for attribute in bet.__dict__:
+                        if attribute.startswith("_"):
+                            continue
+                        if attribute == "previous_wager":
+                            bet.previous_wager += self.bets[index].wager
+                        if getattr(self.bets[index], attribute) != getattr(bet, attribute):
+                            setattr(self.bets[index], attribute, getattr(bet, attribute))
+                else:
+                    new_bets.append(bet)
+
+            self.bets.extend(new_bets)
 
         return self
 
+    def effective_odds(self, lay: bool = False) -> typing.Tuple[array, array]:
+        """Returns the commission adjusted odds and implied probability of every bet, in the same
+        order as `bets`. See `Bet.effective_odds`, `Bet.effective_lay_odds` and
+        `Bet.implied_probability`.
+
+        Args:
+            lay (bool): If True, the odds are given as lay odds. Defaults to False (back odds).
+
+        Returns:
+            tuple[array, array]: Arrays of effective odds and implied probabilities.
+        """
+        snapshot = self._read()
+        return array('d', snapshot.effective_lay_odds if lay else snapshot.effective_odds), \
+            array('d', snapshot.implied_probabilities)
+
     def as_dict(self, wagers_only: bool = False) -> typing.Dict[str, typing.Any]:
         """Returns the event as a dictionary, with values adjusted to match api formatting.
 
         Returns:
             dict: The event as a dictionary.
         """
-        result = {}
-        for default_key, default_value in DEFAULTS.items():
-            if default_key in ["bookmakers", "bets"]:
-                continue
-            current_value = getattr(self, default_key)
-            if current_value != default_value:
-                result[default_key] = current_value
-
-        result["bookmakers"] = [bookmaker.as_dict() for bookmaker in self.bookmakers]
-        result["bets"] = [{key: val for key, val in bet.as_dict().items()} for bet in self.bets if not(wagers_only) or bet.wager != 0]
+        snapshot = self._read()
+        result = dict(snapshot.attributes)
+        result["bookmakers"] = [dict(bookmaker) for bookmaker in snapshot.bookmakers]
+        result["bets"] = [dict(bet) for wager, bet in snapshot.bets if not(wagers_only) or wager != 0]
         return result
 
     @classmethod
@@ -235,9 +340,10 @@ class Event:
 
         updated_event = Event.from_dict(json.loads(data))
 
-        for updated_bet in updated_event.bets:
-            self.add_bet(updated_bet)
+        with self.batch():
+            for updated_bet in updated_event.bets:
+                self.add_bet(updated_bet)
 
-        self.profit = updated_event.profit
+            self.profit = updated_event.profit
 
         return self
@@ -0,0 +1,252 @@
+import asyncio
+import inspect
+import logging
+import time
+import typing
+
+from .bet import Bet
+from .event import Event
+
+SELECTION_KEY_T = typing.Tuple[int, str, int, bool]
+CONSUMER_T = typing.Callable[[typing.Hashable, Event], typing.Any]
+
+logger = logging.getLogger(__name__)
+
+
+def _selection_key(bet: Bet) -> SELECTION_KEY_T:
+    bookmaker_id = bet.bookmaker if isinstance(bet.bookmaker, int) else bet.bookmaker._id
+    return bet.bet_type.value, bet.value, bookmaker_id, bet.lay
+
+
+class FeedMetrics:
+    """Counters describing how the pipeline is keeping up with its feed."""
+
+    def __init__(self) -> None:
+        self.received: int = 0      # updates passed to put/put_nowait
+        self.coalesced: int = 0     # updates overwritten by a newer price before being applied
+        self.dropped: int = 0       # updates rejected by put_nowait because the pipeline was full
+        self.applied: int = 0       # updates applied to an event
+        self.batches: int = 0       # batches of updates applied to an event
+        self.last_lag: float = 0.0  # seconds between the oldest update in the last batch arriving and it being applied
+        self.max_lag: float = 0.0
+        self.apply_errors: int = 0      # batches that raised while being applied
+        self.consumer_errors: int = 0   # consumer calls that raised
+
+    def as_dict(self) -> typing.Dict[str, typing.Union[int, float]]:
+        """Returns the metrics as a dictionary.
+
+        Returns:
+            dict: The metrics as a dictionary.
+        """
+        return dict(self.__dict__)
+
+
+class FeedPipeline:
+    """Applies live odds updates to events, coalescing the updates that arrive for each event
+    while it waits to be processed, so only the latest price per selection is applied.
+
+    Consumers (serialising, solving, submitting...) are called with each event that changed,
+    at most once per `interval` seconds each. Exceptions raised while applying updates or by a
+    consumer are logged and counted in `metrics`, and the pipeline keeps running.
+
+    Example:
+        async with FeedPipeline({"fixture-1": event}) as pipeline:
+            pipeline.add_consumer(lambda key, event: print(event.as_dict()), interval=0.5)
+            async for key, bet in feed:
+                await pipeline.put(key, bet)
+    """
+
+    def __init__(self,
+                 events: typing.Optional[typing.Dict[typing.Hashable, Event]] = None,
+                 max_pending: int = 10000
+                 ) -> None:
+        """
+        Args:
+            events (dict[Hashable, Event] | None): The events to update, keyed by the key used in
+            the feed. Updates for unknown keys create a new Event.
+            max_pending (int): The maximum number of selections waiting to be applied. `put`
+            waits for space once this is reached, `put_nowait` drops the update. Defaults to 10000.
+        """
+        self.events: typing.Dict[typing.Hashable, Event] = {} if events is None else events
+        self.max_pending = max_pending
+        self.metrics = FeedMetrics()
+
+        self._pending: typing.Dict[typing.Hashable, typing.Dict[SELECTION_KEY_T, typing.Tuple[Bet, float]]] = {}
+        self._pending_count = 0
+        self._ready: typing.Optional[asyncio.Queue] = None
+        self._space: typing.Optional[asyncio.Condition] = None
+        self._consumers: typing.List[typing.Tuple[CONSUMER_T, float, typing.Set[typing.Hashable]]] = []
+        self._tasks: typing.List[asyncio.Task] = []
+
+    async def __aenter__(self) -> 'FeedPipeline':
+        self.start()
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.stop()
+
+    def start(self) -> 'FeedPipeline':
+        """Starts applying updates and running consumers. Must be called from a running event loop.
+
+        Returns:
+            FeedPipeline: This pipeline object.
+        """
+        self._ready = asyncio.Queue()
+        self._space = asyncio.Condition()
+        self._tasks.append(asyncio.create_task(self._apply_loop()))
+        for consumer in self._consumers:
+            self._tasks.append(asyncio.create_task(self._consumer_loop(*consumer)))
+        return self
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stops the pipeline.
+
+        Args:
+            drain (bool): If True, pending updates are applied and consumers called one last time
+            before stopping. Defaults to True.
+        """
+        if drain and self._ready is not None:
+            await self.join()
+            for consumer, _, dirty in self._consumers:
+                await self._consume(consumer, dirty)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def join(self) -> None:
+        """Waits until every pending update has been applied."""
+        assert self._ready is not None, "Pipeline has not been started."
+        await self._ready.join()
+
+    def add_consumer(self, consumer: CONSUMER_T, interval: float = 0.0) -> 'FeedPipeline':
+        """Registers a callable to run for every event that changed.
+
+        Args:
+            consumer (Callable[[Hashable, Event], Any]): Called, or awaited if it is a coroutine
+            function, with the event key and event.
+            interval (float): Minimum seconds between calls to this consumer. Events that change
+            several times within the interval are passed once. Defaults to 0.0.
+
+        Returns:
+            FeedPipeline: This pipeline object.
+        """
+        entry = (consumer, interval, set())
+        self._consumers.append(entry)
+        if self._ready is not None:
+            self._tasks.append(asyncio.create_task(self._consumer_loop(*entry)))
+        return self
+
+    async def put(self, event_key: typing.Hashable, bet: Bet) -> None:
+        """Queues an odds update, waiting for space if the pipeline is full.
+
+        Args:
+            event_key (Hashable): The key of the event the bet belongs to.
+            bet (Bet): The bet carrying the latest odds and volume for its selection.
+        """
+        assert self._space is not None, "Pipeline has not been started."
+        self.metrics.received += 1
+        async with self._space:
+            await self._space.wait_for(lambda: self._has_space(event_key, bet))
+        self._queue(event_key, bet)
+
+    def put_nowait(self, event_key: typing.Hashable, bet: Bet) -> bool:
+        """Queues an odds update, dropping it if the pipeline is full.
+
+        Returns:
+            bool: True if the update was queued.
+        """
+        assert self._ready is not None, "Pipeline has not been started."
+        self.metrics.received += 1
+        if not self._has_space(event_key, bet):
+            self.metrics.dropped += 1
+            return False
+        self._queue(event_key, bet)
+        return True
+
+    def _has_space(self, event_key: typing.Hashable, bet: Bet) -> bool:
+        # Replacing a pending price never needs more space.
+        return self._pending_count < self.max_pending or _selection_key(bet) in self._pending.get(event_key, {})
+
+    def _queue(self, event_key: typing.Hashable, bet: Bet) -> None:
+        assert self._ready is not None
+        key = _selection_key(bet)
+        pending = self._pending.get(event_key)
+        if pending is None:
+            pending = self._pending[event_key] = {}
+            self._ready.put_nowait(event_key)
+
+        if key in pending:
+            self.metrics.coalesced += 1
+            pending[key] = (bet, pending[key][1])   # keep the arrival time of the oldest update
+        else:
+            pending[key] = (bet, time.monotonic())
+            self._pending_count += 1
+
+    async def _apply_loop(self) -> None:
+        assert self._ready is not None and self._space is not None
+        while True:
+            event_key = await self._ready.get()
+            pending = self._pending.pop(event_key)
+            self._pending_count -= len(pending)
+            applied = False
+            try:
+                self._apply(event_key, [bet for bet, _ in pending.values()])
+                applied = True
+            except Exception:
+                self.metrics.apply_errors += 1
+                logger.exception("Failed to apply odds updates to event %r", event_key)
+            finally:
+                lag = time.monotonic() - min(arrived for _, arrived in pending.values())
+                self.metrics.last_lag = lag
+                self.metrics.max_lag = max(self.metrics.max_lag, lag)
+                self.metrics.batches += 1
+                self._ready.task_done()
+                async with self._space:
+                    self._space.notify_all()
+            if applied:
+                for _, _, dirty in self._consumers:
+                    dirty.add(event_key)
+            await asyncio.sleep(0)  # let feeds and consumers run between batches
+
+    def _apply(self, event_key: typing.Hashable, bets: typing.List[Bet]) -> None:
+        event = self.events.get(event_key)
+        if event is None:
+            event = self.events[event_key] = Event()
+
+        with event.batch():
+            # Built on every batch so bets added outside the pipeline are found too.
+            selections = {_selection_key(bet): bet for bet in event.bets}
+            bookmaker_ids = {bookmaker._id for bookmaker in event.bookmakers}
+
+            new_bets = []
+            for bet in bets:
+                bet_type, value, bookmaker_id, lay = _selection_key(bet)
+                if isinstance(bet.bookmaker, int) and bookmaker_id not in bookmaker_ids:
+                    bookmaker_id = Bet.DefaultBookmaker._id     # as Event.add_bet resolves unknown ids
+                current = selections.get((bet_type, value, bookmaker_id, lay))
+                if current is None:
+                    new_bets.append(bet)
+                    continue
+                current.odds = bet.odds
+                current.volume = bet.volume
+            if new_bets:
+                event.add_bets(new_bets)
+        self.metrics.applied += len(bets)
+
+    async def _consumer_loop(self, consumer: CONSUMER_T, interval: float, dirty: typing.Set[typing.Hashable]) -> None:
+        while True:
+            started = time.monotonic()
+            await self._consume(consumer, dirty)
+            await asyncio.sleep(max(interval - (time.monotonic() - started), 0.001))
+
+    async def _consume(self, consumer: CONSUMER_T, dirty: typing.Set[typing.Hashable]) -> None:
+        while dirty:
+            event_key = dirty.pop()
+            try:
+                result = consumer(event_key, self.events[event_key])
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                self.metrics.consumer_errors += 1
+                logger.exception("Consumer %r failed for event %r", consumer, event_key)
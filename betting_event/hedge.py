@@ -0,0 +1,321 @@
+import math
+import typing
+
+from .bet import Bet, BetType
+from .event import Event
+
+
+class Hedge(typing.NamedTuple):
+    """The hedge for one market of an event.
+
+    Attributes:
+        event (Event): The event the market belongs to.
+        bet_type (BetType): The bet type of the market.
+        market (str): Identifies the market within the bet type, e.g. the goal line `2.5` or
+        the team `home`. Empty for bet types with a single market.
+        wagers (list[tuple[Bet, float]]): The wager to place on each hedging bet. For lay bets
+        this is the backers stake, matching `Bet.wager`.
+        profit (dict[str, float]): The profit for each outcome once the existing positions and
+        the hedge are settled.
+    """
+    event: Event
+    bet_type: BetType
+    market: str
+    wagers: typing.List[typing.Tuple[Bet, float]]
+    profit: typing.Dict[str, float]
+
+
+def _single(outcomes: typing.Tuple[str, ...]) -> typing.Callable[[str], typing.Optional[typing.Tuple[str, str, typing.Tuple[str, ...]]]]:
+    return lambda value: ("", value, outcomes) if value in outcomes else None
+
+def _team(outcomes: typing.Tuple[str, ...]) -> typing.Callable[[str], typing.Optional[typing.Tuple[str, str, typing.Tuple[str, ...]]]]:
+    def split(value: str) -> typing.Optional[typing.Tuple[str, str, typing.Tuple[str, ...]]]:
+        team, outcome = value.split(" ", 1)
+        return team, outcome, outcomes
+    return split
+
+def _goal_line(value: str) -> typing.Optional[typing.Tuple[str, str, typing.Tuple[str, ...]]]:
+    *team, position, line = value.split(" ")
+    if float(line) % 1 != 0.5:  # whole and quarter lines can be refunded, so there is no single winning outcome
+        return None
+    return " ".join([*team, str(float(line))]), position, ("over", "under")
+
+# Bet types whose values split into markets of mutually exclusive outcomes, exactly one of which wins.
+MARKETS: typing.Dict[BetType, typing.Callable[[str], typing.Optional[typing.Tuple[str, str, typing.Tuple[str, ...]]]]] = {
+    BetType.MatchWinner:        _single(("home", "draw", "away")),
+    BetType.BothTeamsToScore:   _single(("yes", "no")),
+    BetType.OddEven:            _single(("odd", "even")),
+    BetType.Goals_OverUnder:    _goal_line,
+    BetType.Team_OverUnder:     _goal_line,
+    BetType.Team_OddEven:       _team(("odd", "even")),
+    BetType.TeamCleanSheet:     _team(("yes", "no")),
+    BetType.Team_WinToNil:      _team(("yes", "no")),
+    BetType.Team_ScoreAGoal:    _team(("yes", "no")),
+}
+
+
+def _returns(bet: Bet, stake: float) -> typing.Tuple[float, float]:
+    """The profit of a wager if the bet's outcome wins, and if any other outcome does."""
+    commission = bet.bookmaker.commission
+    if bet.lay:
+        return -stake * (bet.odds - 1), stake * (1 - commission)
+    return stake * (bet.odds - 1) * (1 - commission), -stake
+
+
+def _settle(profit: typing.Dict[str, float], outcome: str, bet: Bet, stake: float) -> None:
+    """Adds the result of a wager on an outcome to the profit of every outcome of its market."""
+    wins, loses = _returns(bet, stake)
+    for other in profit:
+        profit[other] += wins if other == outcome else loses
+
+
+def _round_wager(event: Event, bet: Bet, wager: float) -> float:
+    precision = event.wager_precision
+    if not bet.bookmaker.ignore_wager_precision and precision > 0:
+        # Snap before flooring so float error can't drop an exact multiple by one step.
+        steps = math.floor(wager / precision + 1e-9)
+        # Dividing by the steps per unit gives the closest float, e.g. 0.3 rather than 0.30000000000000004.
+        per_unit = round(1 / precision)
+        wager = steps / per_unit if per_unit and abs(per_unit * precision - 1) < 1e-12 else steps * precision
+    return wager if wager >= bet.bookmaker.lowest_valid_wager else 0.0
+
+
+def _capacity(bet: Bet, bookmaker_spent: typing.Dict[int, float]) -> float:
+    """The most that can be risked on a bet, ignoring other hedging wagers at its bookmaker."""
+    risk_per_wager = (bet.odds - 1) if bet.lay else 1.0
+    capacity = float("inf")
+    if bet.volume >= 0:
+        capacity = max(bet.volume - bet.previous_wager, 0.0) * risk_per_wager
+    if bet.bookmaker.wager_limit >= 0:
+        capacity = min(capacity, max(bet.bookmaker.wager_limit - bookmaker_spent.get(bet.bookmaker._id, 0.0), 0.0))
+    return capacity
+
+
+def _walk(covers: typing.List[typing.Tuple[float, str, str, Bet]],
+          profit: typing.Dict[str, float],
+          bookmaker_spent: typing.Dict[int, float]
+          ) -> typing.Tuple[typing.Dict[int, float], bool]:
+    """Plans the amount to risk on each bet by raising every outcome towards a common payout
+    target, for as long as that improves the worst outcome.
+
+    Raising the target by dK raises every outcome below it by dK and costs dK / e on each of
+    them, where e is the effective odds of the best bet left to cover it, so the worst outcome
+    rises with slope 1 - sum(1 / e). The slope only changes where an outcome starts needing
+    cover or a bet's volume or its bookmaker's `wager_limit` runs out, so the target is raised
+    corner to corner in a single pass over the covers. The walk stops when the slope turns
+    negative, an outcome runs out of bets or the target reaches the best outcome.
+
+    Returns:
+        tuple: The amount to risk on each bet (by id), and whether a bookmaker's wager limit
+        ran out on the way.
+    """
+    tiers: typing.Dict[str, typing.List[typing.Tuple[float, Bet]]] = {outcome: [] for outcome in profit}
+    for effective_odds, covered, _, bet in covers:
+        tiers[covered].append((effective_odds, bet))
+
+    target, highest = min(profit.values()), max(profit.values())
+    spent = dict(bookmaker_spent)
+    risked: typing.Dict[int, float] = {}
+    limit_reached = False
+    position = dict.fromkeys(profit, -1)
+    remaining = dict.fromkeys(profit, 0.0)  # payout left on the bet currently covering each outcome
+    while target < highest:
+        active = [outcome for outcome, value in profit.items() if value <= target]
+        slope = 1.0
+        for outcome in active:
+            # Capacities are only looked up for the bets the walk reaches.
+            if position[outcome] >= 0:
+                effective_odds, bet = tiers[outcome][position[outcome]]
+                remaining[outcome] = min(remaining[outcome], _capacity(bet, spent) * effective_odds)
+            while remaining[outcome] <= 1e-12 and position[outcome] + 1 < len(tiers[outcome]):
+                position[outcome] += 1
+                effective_odds, bet = tiers[outcome][position[outcome]]
+                remaining[outcome] = _capacity(bet, spent) * effective_odds
+            if remaining[outcome] <= 1e-12:
+                return risked, limit_reached    # an outcome that needs cover has none left
+            slope -= 1 / tiers[outcome][position[outcome]][0]
+        if slope <= 0:
+            break
+
+        # Bets at the same bookmaker draw on its wager limit together.
+        limits: typing.Dict[int, typing.Tuple[float, float]] = {}
+        for outcome in active:
+            effective_odds, bet = tiers[outcome][position[outcome]]
+            if bet.bookmaker.wager_limit >= 0:
+                left, rate = limits.get(bet.bookmaker._id, (bet.bookmaker.wager_limit - spent.get(bet.bookmaker._id, 0.0), 0.0))
+                limits[bet.bookmaker._id] = (left, rate + 1 / effective_odds)
+
+        step = min([highest - target] +
+                   [value - target for value in profit.values() if value > target] +
+                   [remaining[outcome] for outcome in active])
+        limit_step = min([left / rate for left, rate in limits.values()], default=step)
+        limit_reached = limit_reached or limit_step <= step
+        step = min(step, limit_step)
+
+        target += step
+        for outcome in active:
+            effective_odds, bet = tiers[outcome][position[outcome]]
+            remaining[outcome] -= step
+            risked[id(bet)] = risked.get(id(bet), 0.0) + step / effective_odds
+            spent[bet.bookmaker._id] = spent.get(bet.bookmaker._id, 0.0) + step / effective_odds
+    return risked, limit_reached
+
+
+def _fill(event: Event,
+          covers: typing.List[typing.Tuple[float, str, str, Bet]],
+          profit: typing.Dict[str, float],
+          bookmaker_spent: typing.Dict[int, float],
+          target: float = 0.0,
+          planned: typing.Optional[typing.Dict[int, float]] = None
+          ) -> typing.Tuple[typing.Dict[int, float], typing.Dict[str, float], typing.Dict[int, float]]:
+    """Covers every outcome up to `target`, best price first, as far as volume and wager limits
+    allow, or risks the `planned` amount (by bet id) on each bet if given. Wagers are rounded
+    down to the event's `wager_precision`.
+
+    Backing outcome o with stake s at effective odds e adds s * e to o and takes s from every
+    outcome, so equal payouts of `target - profit[o]` leave every outcome on the same profit.
+
+    Returns:
+        tuple: The wager for each bet (by id), the resulting profit per outcome and the updated
+        amounts risked per bookmaker.
+    """
+    shortfall = {outcome: target - value for outcome, value in profit.items()}
+    spent = dict(bookmaker_spent)
+    won = dict.fromkeys(profit, 0.0)    # settled on one outcome only
+    lost = 0.0                          # settled on every outcome
+    wagers: typing.Dict[int, float] = {}
+    for effective_odds, covered, outcome, bet in covers:
+        if planned is not None:
+            if id(bet) not in planned:
+                continue
+            risk = planned[id(bet)]
+        elif shortfall[covered] <= 0:
+            continue
+        else:
+            risk = min(shortfall[covered] / effective_odds, _capacity(bet, spent))
+        risk_per_wager = (bet.odds - 1) if bet.lay else 1.0
+        wager = _round_wager(event, bet, risk / risk_per_wager)
+        if wager <= 0:
+            continue
+        wagers[id(bet)] = wager
+        spent[bet.bookmaker._id] = spent.get(bet.bookmaker._id, 0.0) + wager * risk_per_wager
+        shortfall[covered] -= wager * risk_per_wager * effective_odds
+        wins, loses = _returns(bet, wager)
+        won[outcome] += wins - loses
+        lost += loses
+    return wagers, {outcome: value + won[outcome] + lost for outcome, value in profit.items()}, spent
+
+
+def _search_fill(event: Event,
+                 covers: typing.List[typing.Tuple[float, str, str, Bet]],
+                 profit: typing.Dict[str, float],
+                 bookmaker_spent: typing.Dict[int, float],
+                 iterations: int = 20
+                 ) -> typing.Tuple[typing.Dict[int, float], typing.Dict[str, float], typing.Dict[int, float]]:
+    """Ternary searches the target of the best price first `_fill` for the best worst outcome."""
+    lowest, highest = min(profit.values()), max(profit.values())
+    for _ in range(iterations):
+        lower, upper = lowest + (highest - lowest) / 3, highest - (highest - lowest) / 3
+        if min(_fill(event, covers, profit, bookmaker_spent, lower)[1].values()) < \
+                min(_fill(event, covers, profit, bookmaker_spent, upper)[1].values()):
+            lowest = lower
+        else:
+            highest = upper
+    return _fill(event, covers, profit, bookmaker_spent, lowest)
+
+
+def hedge_event(event: Event, apply: bool = False) -> typing.List[Hedge]:
+    """Calculates the wagers that equalise the profit across all outcomes of each market that
+    holds a position (a bet with a `previous_wager`).
+
+    Each outcome is covered by backing it, or in two outcome markets also by laying the other
+    outcome, starting from the best commission adjusted odds. A bet's `volume` and its
+    bookmaker's `wager_limit` cap the wager placed on it. When liquidity runs out the hedge
+    maximises the worst outcome instead, so it is never worse than not hedging, and
+    `Hedge.profit` shows the remaining exposure. Each market costs O(k log k) in the number of
+    bets k offered on it, plus a short search when its outcomes exhaust a shared wager limit.
+
+    Args:
+        event (Event): The event holding the positions and the current bets.
+        apply (bool): If True, `Bet.wager` is set to the calculated hedge wager for every bet in
+        a hedged market. Defaults to False.
+
+    Returns:
+        list[Hedge]: One hedge per market with an open position.
+    """
+    with event.batch():
+        markets: typing.Dict[typing.Tuple[BetType, str], typing.Tuple[typing.Tuple[str, ...], typing.List[typing.Tuple[str, Bet]]]] = {}
+        bookmaker_spent: typing.Dict[int, float] = {}
+        for bet in event.bets:
+            if bet.previous_wager:
+                bookmaker_spent[bet.bookmaker._id] = bookmaker_spent.get(bet.bookmaker._id, 0.0) + \
+                    bet.previous_wager * ((bet.odds - 1) if bet.lay else 1)
+            split_value = MARKETS.get(bet.bet_type)
+            if split_value is None:
+                continue
+            split = split_value(bet.value.lower())
+            if split is None:
+                continue
+            market, outcome, market_outcomes = split
+            key = (bet.bet_type, market)
+            entry = markets.get(key)
+            if entry is None:
+                if event.no_draw and bet.bet_type is BetType.MatchWinner:
+                    market_outcomes = ("home", "away")
+                entry = markets[key] = (market_outcomes, [])
+            entry[1].append((outcome, bet))
+
+        hedges = []
+        for (bet_type, market), (market_outcomes, market_bets) in markets.items():
+            if not any(bet.previous_wager for _, bet in market_bets):
+                continue
+
+            # Every way to cover an outcome, best price first: (effective odds, outcome covered, outcome, bet),
+            # settling the existing positions on the way.
+            profit = {outcome: 0.0 for outcome in market_outcomes}
+            covers = []
+            for outcome, bet in market_bets:
+                if outcome not in profit:
+                    continue
+                if bet.previous_wager:
+                    _settle(profit, outcome, bet, bet.previous_wager)
+                if bet.odds <= 1:
+                    continue
+                if not bet.lay:
+                    covers.append((bet.effective_odds, outcome, outcome, bet))
+                elif len(profit) == 2:
+                    other = next(other for other in profit if other != outcome)
+                    covers.append((bet.effective_odds, other, outcome, bet))
+            covers.sort(key=lambda cover: cover[0], reverse=True)
+
+            planned, limit_reached = _walk(covers, profit, bookmaker_spent)
+            candidates = [({}, dict(profit), bookmaker_spent), _fill(event, covers, profit, bookmaker_spent, planned=planned)]
+            if limit_reached:
+                # Outcomes sharing a bookmaker's wager limit can need it split in ways the walk
+                # misses, so also try filling the best prices first.
+                candidates.append(_search_fill(event, covers, profit, bookmaker_spent))
+            wagers, hedged_profit, spent = max(candidates, key=lambda candidate: min(candidate[1].values()))
+            bookmaker_spent = spent
+            profit = hedged_profit
+
+            hedge_wagers = [(bet, wagers[id(bet)]) for _, bet in market_bets if id(bet) in wagers]
+            if apply:
+                for _, bet in market_bets:
+                    bet.wager = wagers.get(id(bet), 0.0)
+
+            hedges.append(Hedge(event, bet_type, market, hedge_wagers, profit))
+
+        return hedges
+
+
+def hedge_events(events: typing.Iterable[Event], apply: bool = False) -> typing.List[Hedge]:
+    """Calculates the hedges for every open position of every event. See `hedge_event`.
+
+    Args:
+        events (Iterable[Event]): The events to hedge.
+        apply (bool): If True, `Bet.wager` is set to the calculated hedge wagers.
+
+    Returns:
+        list[Hedge]: One hedge per market with an open position, across all events.
+    """
+    return [hedge for event in events for hedge in hedge_event(event, apply)]
@@ -0,0 +1,195 @@
+import heapq
+import itertools
+import typing
+
+from .bet import Bet, BetType
+from .event import Event
+
+SELECTION_T = typing.Tuple[BetType, str]
+
+
+class _SelectionHeap:
+    """Max-heap of the back bets offered on one selection. Stale entries are discarded lazily
+    whenever they reach the top of the heap."""
+
+    def __init__(self) -> None:
+        self.heap: typing.List[typing.Tuple[float, int, int]] = []
+        self.live: typing.Dict[int, typing.Tuple[float, int]] = {}    # id(bet): (effective odds, entry id)
+
+    def push(self, bet_id: int, effective_odds: float, entry_id: int) -> None:
+        self.live[bet_id] = (effective_odds, entry_id)
+        heapq.heappush(self.heap, (-effective_odds, entry_id, bet_id))
+        if len(self.heap) > 2 * len(self.live) + 16:     # stop stale entries piling up between queries
+            self.heap = [(-odds, entry, key) for key, (odds, entry) in self.live.items()]
+            heapq.heapify(self.heap)
+
+    def discard(self, bet_id: int) -> None:
+        self.live.pop(bet_id, None)
+
+    def _prune(self) -> None:
+        while self.heap:
+            _, entry_id, bet_id = self.heap[0]
+            if bet_id in self.live and self.live[bet_id][1] == entry_id:
+                return
+            heapq.heappop(self.heap)
+
+    def top_two(self) -> typing.Tuple[typing.Optional[int], typing.Optional[int]]:
+        self._prune()
+        if not self.heap:
+            return None, None
+        best = heapq.heappop(self.heap)
+        self._prune()
+        runner_up = self.heap[0][2] if self.heap else None
+        heapq.heappush(self.heap, best)
+        return best[2], runner_up
+
+
+class BestOddsIndex:
+    """Tracks the best and second best commission adjusted back odds for every selection
+    (bet type and value) of one or more events.
+
+    The index does not watch the bets it holds. Call `update_bet` after changing a bet's odds or
+    lay flag (`Event.add_bet` updates existing bets in place), `update_bookmaker` after changing
+    a bookmaker's commission (e.g. through `Event.add_bookmaker`), `add_event` again to pick up
+    bets appended to an event (e.g. by `Event.add_bets` or `FeedPipeline`), and
+    `remove_bookmaker` when a bookmaker should no longer be considered. Each bet update costs
+    O(log k) where k is the number of bets offered on the selection.
+    """
+
+    def __init__(self, events: typing.Optional[typing.Iterable[Event]] = None) -> None:
+        self._entry_ids = itertools.count()
+        self._selections: typing.Dict[typing.Tuple[int, SELECTION_T], _SelectionHeap] = {}
+        self._bets: typing.Dict[int, typing.Tuple[Bet, int, SELECTION_T, int]] = {}     # id(bet): (bet, id(event), selection, bookmaker id)
+        self._bookmaker_bets: typing.Dict[int, typing.Set[int]] = {}                # bookmaker._id: {id(bet)}
+        self._events: typing.Dict[int, Event] = {}
+        self._removed_bookmakers: typing.Set[int] = set()
+
+        for event in events or []:
+            self.add_event(event)
+
+    def add_event(self, event: Event) -> 'BestOddsIndex':
+        """Adds every bet of an event to the index. Calling this again for an indexed event adds
+        only the bets appended since; use `update_bet` or `update_bookmaker` to re-rank bets that
+        are already indexed.
+
+        Args:
+            event (Event): The event to index.
+
+        Returns:
+            BestOddsIndex: This index object.
+        """
+        self._events[id(event)] = event
+        with event.batch():
+            for bet in event.bets:
+                if id(bet) not in self._bets:
+                    self.update_bet(bet, event)
+        return self
+
+    def update_bet(self, bet: Bet, event: typing.Optional[Event] = None) -> 'BestOddsIndex':
+        """Adds a bet to the index, or re-ranks it if it is already indexed. Bets offered by a
+        bookmaker removed with `remove_bookmaker` are ignored.
+
+        Args:
+            bet (Bet): The new or updated bet.
+            event (Event | None): The event the bet belongs to. Only required the first time the
+            bet is indexed.
+
+        Returns:
+            BestOddsIndex: This index object.
+        """
+        if bet.bookmaker._id in self._removed_bookmakers:
+            return self.remove_bet(bet)
+        if id(bet) in self._bets:
+            event_id = self._bets[id(bet)][1]
+            self.remove_bet(bet)
+        elif event is None:
+            raise ValueError("An event must be given the first time a bet is added to the index.")
+        else:
+            event_id = id(event)
+            self._events[event_id] = event
+
+        selection = (bet.bet_type, bet.value)
+        self._bets[id(bet)] = (bet, event_id, selection, bet.bookmaker._id)
+        self._bookmaker_bets.setdefault(bet.bookmaker._id, set()).add(id(bet))
+
+        if not bet.lay and bet.odds > 1:     # invalid odds have no effective odds to rank by
+            self._selections.setdefault((event_id, selection), _SelectionHeap()).push(
+                id(bet), bet.effective_odds, next(self._entry_ids))
+        return self
+
+    def remove_bet(self, bet: Bet) -> 'BestOddsIndex':
+        """Removes a bet from the index. Bets that are not indexed are ignored.
+
+        Returns:
+            BestOddsIndex: This index object.
+        """
+        if id(bet) not in self._bets:
+            return self
+        _, event_id, selection, bookmaker_id = self._bets.pop(id(bet))
+        if (event_id, selection) in self._selections:
+            self._selections[(event_id, selection)].discard(id(bet))
+        self._bookmaker_bets.get(bookmaker_id, set()).discard(id(bet))
+        return self
+
+    def remove_bookmaker(self, bookmaker) -> 'BestOddsIndex':
+        """Removes every bet offered by a bookmaker from the index, and keeps its bets out of the
+        index from then on.
+
+        Args:
+            bookmaker (Bookmaker | int): The bookmaker, or bookmaker id, to remove.
+
+        Returns:
+            BestOddsIndex: This index object.
+        """
+        bookmaker_id = bookmaker if isinstance(bookmaker, int) else bookmaker._id
+        self._removed_bookmakers.add(bookmaker_id)
+        for bet_id in list(self._bookmaker_bets.pop(bookmaker_id, set())):
+            self.remove_bet(self._bets[bet_id][0])
+        return self
+
+    def update_bookmaker(self, bookmaker) -> 'BestOddsIndex':
+        """Re-ranks every indexed bet offered by a bookmaker, e.g. after its commission changed.
+
+        Args:
+            bookmaker (Bookmaker | int): The bookmaker, or bookmaker id, to update.
+
+        Returns:
+            BestOddsIndex: This index object.
+        """
+        bookmaker_id = bookmaker if isinstance(bookmaker, int) else bookmaker._id
+        for bet_id in list(self._bookmaker_bets.get(bookmaker_id, set())):
+            self.update_bet(self._bets[bet_id][0])
+        return self
+
+    def best(self, event: Event, bet_type: typing.Union[BetType, str, int], value: str
+             ) -> typing.Tuple[typing.Optional[Bet], typing.Optional[Bet]]:
+        """Returns the best and runner-up back bets for a selection.
+
+        Args:
+            event (Event): The event the selection belongs to.
+            bet_type (BetType | str | int): The bet type of the selection.
+            value (str): The bet value of the selection.
+
+        Returns:
+            tuple[Bet | None, Bet | None]: The best and runner-up bets, None where not available.
+        """
+        bet_type = BetType[bet_type] if isinstance(bet_type, str) else BetType(bet_type)
+        heap = self._selections.get((id(event), (bet_type, value)))
+        if heap is None:
+            return None, None
+        return tuple(None if bet_id is None else self._bets[bet_id][0] for bet_id in heap.top_two())  # type: ignore
+
+    def best_all(self) -> typing.Dict[Event, typing.Dict[SELECTION_T, typing.Tuple[typing.Optional[Bet], typing.Optional[Bet]]]]:
+        """Returns the best and runner-up back bets for every selection of every indexed event.
+
+        Returns:
+            dict: {event: {(bet_type, value): (best bet, runner-up bet)}}. Selections with no
+            back bets left are omitted.
+        """
+        result: dict = {event: {} for event in self._events.values()}
+        for (event_id, selection), heap in self._selections.items():
+            best, runner_up = heap.top_two()
+            if best is None:
+                continue
+            result[self._events[event_id]][selection] = (self._bets[best][0], None if runner_up is None else self._bets[runner_up][0])
+        return result
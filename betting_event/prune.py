@@ -0,0 +1,109 @@
+import math
+import typing
+
+from .bet import Bet
+from .event import EVENT_T, Event
+
+
+class PrunedEvent(typing.NamedTuple):
+    """An event reduced to the bets that can receive a wager.
+
+    Attributes:
+        event (Event): A new event holding copies of the remaining bets and the bookmakers they use.
+        originals (list[Bet]): The original bet for each bet in `event.bets`, by index.
+        removed (list[tuple[Bet, str]]): The original bets that were removed, with the reason.
+    """
+    event: Event
+    originals: typing.List[Bet]
+    removed: typing.List[typing.Tuple[Bet, str]]
+
+    def apply_wagers(self) -> None:
+        """Copies the wagers calculated for the pruned event (e.g. by `send_to_RapidAPI`) back to
+        the original bets. Removed bets have their wager set to 0.0."""
+        for pruned_bet, original in zip(self.event.bets, self.originals):
+            original.wager = pruned_bet.wager
+        for original, _ in self.removed:
+            original.wager = 0.0
+
+
+def _unconstrained(bet: Bet) -> bool:
+    bookmaker = bet.bookmaker
+    return bet.volume < 0 and bookmaker.wager_limit < 0 and bookmaker.max_wager_count < 0
+
+
+def _dominates(better: Bet, worse: Bet) -> bool:
+    """True if `better` can take any wager `worse` could, on the same terms or better."""
+    return _unconstrained(better) and \
+        better.bookmaker.lowest_valid_wager <= worse.bookmaker.lowest_valid_wager and \
+        (better.bookmaker.ignore_wager_precision or not worse.bookmaker.ignore_wager_precision)
+
+
+def prune_event(event: EVENT_T) -> PrunedEvent:
+    """Removes the bets of an event that can never receive a wager, shrinking the payload sent
+    to the calculator. Bets with a `previous_wager` are always kept. A bet is removed if:
+        - its odds are 1.0 or lower, or its `volume` is 0.
+        - its bookmaker has already reached `max_wager_count` or `wager_limit`.
+        - the same bookmaker offers the same selection (bet type, value, back/lay) at better
+          odds, with no volume restricting it.
+        - another bet on the same selection has better or equal commission adjusted odds, and no
+          volume, wager limit or wager count restricting it.
+
+    Args:
+        event (Event): The event to prune. It is not modified.
+
+    Returns:
+        PrunedEvent: The pruned event, and the mapping back to the original bets.
+    """
+    with event.batch():
+        bets = list(event.bets)
+
+        wager_counts: typing.Dict[int, int] = {}
+        wager_totals: typing.Dict[int, float] = {}
+        for bet in bets:
+            if bet.previous_wager > 0:
+                bookmaker_id = bet.bookmaker._id
+                wager_counts[bookmaker_id] = wager_counts.get(bookmaker_id, 0) + 1
+                wager_totals[bookmaker_id] = wager_totals.get(bookmaker_id, 0.0) + \
+                    bet.previous_wager * ((bet.odds - 1) if bet.lay else 1)
+
+        removed: typing.Dict[int, str] = {}
+        selections: typing.Dict[typing.Tuple[typing.Any, str, bool], typing.List[Bet]] = {}
+        for bet in bets:
+            if bet.previous_wager > 0:
+                selections.setdefault((bet.bet_type, bet.value.lower(), bet.lay), []).append(bet)
+                continue
+
+            bookmaker = bet.bookmaker
+            if bet.odds <= 1:
+                removed[id(bet)] = "odds"
+            elif bet.volume == 0:
+                removed[id(bet)] = "volume"
+            elif 0 <= bookmaker.max_wager_count <= wager_counts.get(bookmaker._id, 0):
+                removed[id(bet)] = "max_wager_count"
+            elif 0 <= bookmaker.wager_limit <= wager_totals.get(bookmaker._id, 0.0):
+                removed[id(bet)] = "wager_limit"
+            else:
+                selections.setdefault((bet.bet_type, bet.value.lower(), bet.lay), []).append(bet)
+
+        for selection_bets in selections.values():
+            # Kept positions can have invalid odds, whose effective odds are NaN and can't be sorted.
+            selection_bets.sort(key=lambda bet: bet.effective_odds if bet.odds > 1 else -math.inf, reverse=True)
+            seen_bookmakers = set()
+            dominator = None
+            for bet in selection_bets:
+                if bet.previous_wager <= 0 and bet.bookmaker._id in seen_bookmakers:
+                    removed[id(bet)] = "duplicate"
+                elif bet.previous_wager <= 0 and dominator is not None and _dominates(dominator, bet):
+                    removed[id(bet)] = "dominated"
+                if bet.volume < 0:
+                    seen_bookmakers.add(bet.bookmaker._id)
+                if dominator is None and _unconstrained(bet):
+                    dominator = bet
+
+        originals = [bet for bet in bets if id(bet) not in removed]
+        bookmaker_ids = {bet.bookmaker._id for bet in originals}
+        event_dict = event.as_dict()
+        event_dict["bookmakers"] = [bookmaker for bookmaker in event_dict["bookmakers"] if bookmaker["id"] in bookmaker_ids]
+        event_dict["bets"] = [bet.as_dict() for bet in originals]
+
+    return PrunedEvent(type(event).from_dict(event_dict), originals, [(bet, removed[id(bet)]) for bet in bets if id(bet) in removed])
@@ -36,3 +36,13 @@ def decimal_to_fractional(decimal_odds: float) -> str:
     numerator /= gcd
     denominator /= gcd
     return f'{int(numerator)}/{int(denominator)}'
+
+def commission_adjusted_odds(decimal_odds: float, commission: float = 0.0, lay: bool = False) -> float:
+    """Converts decimal odds to the equivalent back odds once commission is taken from winnings.
+    For lay bets this is the back odds that would return the same profit for the same risk.
+    Returns NaN for odds of 1.0 or lower, which can't be backed or laid."""
+    if decimal_odds <= 1:
+        return math.nan
+    if lay:
+        return 1 + (1 - commission) / (decimal_odds - 1)
+    return 1 + (decimal_odds - 1) * (1 - commission)
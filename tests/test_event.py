@@ -1,3 +1,7 @@
+import copy
+import math
+import pickle
+import threading
 import unittest
 
 import betting_event as b_event
@@ -108,3 +112,146 @@ class TestEvent(unittest.TestCase):
             ],
             "bookmakers": [{'id': 0}]
         })
+
+    def test_add_bets_keeps_input(self):
+        event = b_event.Event()
+        event.add_bet(b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=2.0))
+        bets = [
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=2.0, wager=10),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="away", odds=3.0),
+        ]
+        event.add_bets(bets)
+        self.assertEqual(len(bets), 2)
+        self.assertEqual(len(event.bets), 2)
+        self.assertEqual(event.bets[0].wager, 10)
+
+    def test_threaded_batches(self):
+        event = b_event.Event()
+        seen = []
+
+        def writer(odds):
+            for i in range(50):
+                with event.batch():
+                    event.add_bet(b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=odds + i))
+                    event.add_bet(b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="away", odds=odds + i))
+
+        def reader():
+            for _ in range(50):
+                seen.append(len(event.as_dict()["bets"]))
+
+        threads = [threading.Thread(target=writer, args=(odds,)) for odds in (2, 200)] + [threading.Thread(target=reader)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(event.bets), 200)
+        self.assertTrue(all(count % 2 == 0 for count in seen))
+
+    def test_reads_during_batch(self):
+        event = b_event.Event()
+        event.add_bet(b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=2.0))
+        self.assertEqual(len(event.as_dict()["bets"]), 1)
+
+        in_batch, release = threading.Event(), threading.Event()
+
+        def writer():
+            with event.batch():
+                event.add_bet(b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="away", odds=3.0))
+                event.bets[0].odds = 2.5
+                in_batch.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        in_batch.wait(5)
+        try:
+            # Served the state from before the batch, without waiting for it to finish.
+            self.assertEqual([bet["odds"] for bet in event.as_dict()["bets"]], [2.0])
+            self.assertEqual(list(event.effective_odds()[0]), [2.0])
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual([bet["odds"] for bet in event.as_dict()["bets"]], [2.5, 3.0])
+
+    def test_reads_see_direct_changes(self):
+        bookmaker = b_event.Bookmaker()
+        event = b_event.Event()
+        event.add_bet(b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=3.0, bookmaker=bookmaker))
+        event.as_dict()
+
+        event.bets[0].wager = 5.0
+        bookmaker.commission = 0.05
+        event.wager_limit = 100.0
+        result = event.as_dict(wagers_only=True)
+        self.assertEqual(result["bets"][0]["wager"], 5.0)
+        self.assertEqual(result["bookmakers"][0]["commission"], 0.05)
+        self.assertEqual(result["wager_limit"], 100.0)
+        self.assertAlmostEqual(event.effective_odds()[0][0], 2.9)
+
+        result["bets"][0]["wager"] = 1.0    # results are copies
+        self.assertEqual(event.as_dict()["bets"][0]["wager"], 5.0)
+
+    def test_copy_and_pickle(self):
+        event = b_event.Event()
+        event.add_bet(b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=2.0))
+        for duplicate in (pickle.loads(pickle.dumps(event)), copy.deepcopy(event), copy.copy(event)):
+            self.assertEqual(duplicate.as_dict(), event.as_dict())
+            self.assertIsNot(duplicate._lock, event._lock)
+
+    def test_effective_odds(self):
+        bookmaker = b_event.Bookmaker(commission=0.05)
+        bet = b_event.Bet(b_event.BetType.MatchWinner, "home", 3.0, bookmaker=bookmaker)
+        self.assertAlmostEqual(bet.effective_odds, 2.9)
+        self.assertAlmostEqual(bet.implied_probability, 1 / 2.9)
+
+        bet.lay = True
+        self.assertAlmostEqual(bet.effective_odds, 1.475)
+        self.assertAlmostEqual(bet.implied_probability, 1 - 1 / 1.475)
+
+        bet.odds = 2.0
+        self.assertAlmostEqual(bet.effective_odds, 1.95)
+
+    def test_effective_lay_odds(self):
+        bookmaker = b_event.Bookmaker(commission=0.05)
+        lay_bet = b_event.Bet(b_event.BetType.MatchWinner, "home", 3.0, lay=True, bookmaker=bookmaker)
+        back_bet = b_event.Bet(b_event.BetType.MatchWinner, "home", 3.0, bookmaker=bookmaker)
+        self.assertAlmostEqual(lay_bet.effective_lay_odds, 1 + 2 / 0.95)
+        self.assertAlmostEqual(back_bet.effective_lay_odds, 1 + 1 / 1.9)
+
+        event = b_event.Event()
+        event.add_bets([lay_bet, back_bet])
+        odds, probabilities = event.effective_odds(lay=True)
+        self.assertAlmostEqual(odds[0], lay_bet.effective_lay_odds)
+        self.assertAlmostEqual(odds[1], back_bet.effective_lay_odds)
+        self.assertEqual(list(probabilities), list(event.effective_odds()[1]))
+
+    def test_effective_odds_commission_update(self):
+        bookmaker = b_event.Bookmaker(commission=0.05)
+        bet = b_event.Bet(b_event.BetType.MatchWinner, "home", 3.0, bookmaker=bookmaker)
+        event = b_event.Event(bookmakers=[bookmaker])
+        event.add_bet(bet)
+        self.assertAlmostEqual(bet.effective_odds, 2.9)
+
+        updated = b_event.Bookmaker.from_dict({"id": bookmaker._id, "commission": 0.1})
+        event.add_bookmaker(updated)
+        self.assertAlmostEqual(bet.effective_odds, 2.8)
+
+        odds, probabilities = event.effective_odds()
+        self.assertEqual(len(odds), 1)
+        self.assertAlmostEqual(odds[0], 2.8)
+        self.assertAlmostEqual(probabilities[0], 1 / 2.8)
+
+    def test_effective_odds_invalid(self):
+        event = b_event.Event()
+        event.add_bets([
+            b_event.Bet(b_event.BetType.MatchWinner, "home", 0.0),
+            b_event.Bet(b_event.BetType.MatchWinner, "away", -2.0),
+            b_event.Bet(b_event.BetType.MatchWinner, "draw", 1.0, lay=True),
+        ])
+        event.add_bet(b_event.Bet(b_event.BetType.MatchWinner, "home", 1.0))
+        for lay in (False, True):
+            odds, probabilities = event.effective_odds(lay=lay)
+            self.assertEqual(len(odds), 4)
+            self.assertTrue(all(math.isnan(value) for value in odds))
+            self.assertTrue(all(math.isnan(value) for value in probabilities))
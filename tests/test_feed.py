@@ -0,0 +1,102 @@
+import asyncio
+import unittest
+
+import betting_event as b_event
+
+
+async def fake_feed(pipeline, ticks):
+    for event_key, value, odds in ticks:
+        await pipeline.put(event_key, b_event.Bet(bet_type=b_event.BetType.MatchWinner, value=value, odds=odds))
+
+
+class TestFeedPipeline(unittest.IsolatedAsyncioTestCase):
+    async def test_coalesce_latest_price(self):
+        consumed = []
+        pipeline = b_event.FeedPipeline()
+        pipeline.add_consumer(lambda key, event: consumed.append(key))
+        async with pipeline:
+            for odds in (2.0, 2.1, 2.2):
+                pipeline.put_nowait("match", b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=odds))
+            await fake_feed(pipeline, [("match", "away", 3.0)])
+
+        event = pipeline.events["match"]
+        self.assertEqual([(bet.value, bet.odds) for bet in event.bets], [("home", 2.2), ("away", 3.0)])
+        self.assertEqual(pipeline.metrics.coalesced, 2)
+        self.assertEqual(pipeline.metrics.applied, 2)
+        self.assertEqual(consumed, ["match"])
+
+    async def test_updates_existing_bet(self):
+        event = b_event.Event()
+        event.add_bet(b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=2.0))
+        bet = event.bets[0]
+        async with b_event.FeedPipeline({1: event}) as pipeline:
+            await fake_feed(pipeline, [(1, "home", 1.8)])
+        self.assertEqual(len(event.bets), 1)
+        self.assertIs(event.bets[0], bet)
+        self.assertEqual(bet.odds, 1.8)
+
+    async def test_backpressure_and_drops(self):
+        pipeline = b_event.FeedPipeline(max_pending=1)
+        async with pipeline:
+            self.assertTrue(pipeline.put_nowait(1, b_event.Bet(bet_type=1, value="home", odds=2.0)))
+            self.assertTrue(pipeline.put_nowait(1, b_event.Bet(bet_type=1, value="home", odds=2.1)))
+            self.assertFalse(pipeline.put_nowait(1, b_event.Bet(bet_type=1, value="away", odds=3.0)))
+            await asyncio.wait_for(fake_feed(pipeline, [(2, "home", 2.0), (2, "away", 3.0)]), 1)
+        self.assertEqual(pipeline.metrics.dropped, 1)
+        self.assertEqual(len(pipeline.events[2].bets), 2)
+
+    async def test_async_consumer_interval(self):
+        calls = []
+
+        async def consumer(key, event):
+            calls.append(len(event.bets))
+
+        pipeline = b_event.FeedPipeline()
+        pipeline.add_consumer(consumer, interval=10)
+        async with pipeline:
+            await fake_feed(pipeline, [("match", "home", 2.0)])
+            await pipeline.join()
+            await asyncio.sleep(0.01)
+            await fake_feed(pipeline, [("match", "away", 3.0)])
+        self.assertEqual(calls, [1, 2])
+
+    async def test_unknown_bookmaker_id_coalesces(self):
+        async with b_event.FeedPipeline() as pipeline:
+            for odds in (2.0, 2.1, 2.2):
+                await pipeline.put("match", b_event.Bet(bet_type=1, value="home", odds=odds, bookmaker=7))
+                await pipeline.join()
+        event = pipeline.events["match"]
+        self.assertEqual(len(event.bets), 1)
+        self.assertEqual(event.bets[0].odds, 2.2)
+
+    async def test_sees_bets_added_outside(self):
+        event = b_event.Event()
+        async with b_event.FeedPipeline({1: event}) as pipeline:
+            await fake_feed(pipeline, [(1, "away", 3.0)])
+            await pipeline.join()
+            event.add_bet(b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=2.0))
+            await fake_feed(pipeline, [(1, "home", 1.9)])
+        self.assertEqual([(bet.value, bet.odds) for bet in event.bets], [("away", 3.0), ("home", 1.9)])
+
+    async def test_errors_are_counted(self):
+        calls = []
+
+        def consumer(key, event):
+            calls.append(key)
+            if len(calls) == 1:
+                raise RuntimeError("submission failed")
+
+        pipeline = b_event.FeedPipeline({3: object()})     # not an Event, so applying to it fails
+        pipeline.add_consumer(consumer)
+        with self.assertLogs("betting_event.feed", "ERROR"):
+            async with pipeline:
+                await pipeline.put(1, b_event.Bet(bet_type=1, value="home", odds=2.0))
+                await pipeline.join()
+                await asyncio.sleep(0.01)
+                await pipeline.put(2, b_event.Bet(bet_type=1, value="home", odds=2.0))
+                await pipeline.put(3, b_event.Bet(bet_type=1, value="home", odds=2.0))
+                await asyncio.wait_for(pipeline.join(), 1)
+                await asyncio.sleep(0.01)
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(pipeline.metrics.consumer_errors, 1)
+        self.assertEqual(pipeline.metrics.apply_errors, 1)
@@ -0,0 +1,115 @@
+import timeit
+import unittest
+
+import betting_event as b_event
+
+
+class TestHedge(unittest.TestCase):
+    def test_back_hedge(self):
+        coral = b_event.Bookmaker()
+        event = b_event.Event(wager_precision=0)
+        event.add_bets([
+            b_event.Bet(bet_type=b_event.BetType.Goals_OverUnder, value="over 2.5", odds=3.0, bookmaker=coral, previous_wager=100),
+            b_event.Bet(bet_type=b_event.BetType.Goals_OverUnder, value="under 2.5", odds=1.5, bookmaker=coral),
+        ])
+        hedge, = b_event.hedge_event(event)
+        self.assertEqual(hedge.market, "2.5")
+        self.assertEqual(hedge.wagers, [(event.bets[1], 200.0)])
+        self.assertAlmostEqual(hedge.profit["over"], 0.0)
+        self.assertAlmostEqual(hedge.profit["under"], 0.0)
+
+    def test_lay_hedge_with_commission(self):
+        betfair = b_event.Bookmaker(commission=0.05)
+        coral = b_event.Bookmaker()
+        event = b_event.Event(wager_precision=0)
+        event.add_bets([
+            b_event.Bet(bet_type=b_event.BetType.BothTeamsToScore, value="yes", odds=3.0, bookmaker=coral, previous_wager=100),
+            b_event.Bet(bet_type=b_event.BetType.BothTeamsToScore, value="yes", odds=2.0, bookmaker=betfair, lay=True),
+        ])
+        hedge, = b_event.hedge_event(event, apply=True)
+        self.assertAlmostEqual(hedge.profit["yes"], hedge.profit["no"])
+        self.assertAlmostEqual(event.bets[1].wager, hedge.wagers[0][1])
+
+    def test_volume_cap(self):
+        event = b_event.Event(wager_precision=0)
+        event.add_bets([
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=2.0, previous_wager=100),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="draw", odds=4.0, volume=10),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="away", odds=4.0),
+        ])
+        hedge, = b_event.hedge_events([event])
+        self.assertEqual(dict((bet.value, wager) for bet, wager in hedge.wagers), {"draw": 10.0, "away": 10.0})
+        self.assertAlmostEqual(hedge.profit["draw"], -80.0)
+        self.assertAlmostEqual(hedge.profit["away"], -80.0)
+        self.assertAlmostEqual(hedge.profit["home"], 80.0)
+
+    def test_never_worse_than_unhedged(self):
+        limited = b_event.Bookmaker(wager_limit=15)
+        for volume, bookmaker in ((0, None), (5, None), (10, None), (30, None), (-1, limited)):
+            event = b_event.Event(wager_precision=0)
+            event.add_bets([
+                b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=2.0, previous_wager=100),
+                b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="draw", odds=1.5, volume=volume, bookmaker=bookmaker),
+                b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="away", odds=4.0),
+                b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="away", odds=3.0, bookmaker=limited),
+            ])
+            unhedged = {"home": 100.0, "draw": -100.0, "away": -100.0}
+            hedge, = b_event.hedge_event(event)
+            self.assertGreaterEqual(min(hedge.profit.values()), min(unhedged.values()) - 1e-9)
+
+    def test_shared_wager_limit(self):
+        limited = b_event.Bookmaker(wager_limit=60)
+        event = b_event.Event()
+        event.add_bets([
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="away", odds=4.5, previous_wager=50),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=5.5, bookmaker=limited),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="draw", odds=4.0, bookmaker=limited),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="draw", odds=3.9, volume=30),
+        ])
+        hedge, = b_event.hedge_event(event)
+        # The limit is best split 37.58 / 22.42 between home and draw, with the rest of the draw at 3.9.
+        self.assertAlmostEqual(min(hedge.profit.values()), 66.66, delta=0.05)
+        self.assertLessEqual(sum(wager for bet, wager in hedge.wagers if bet.bookmaker is limited), 60)
+
+    def test_no_position(self):
+        event = b_event.Event()
+        event.add_bet(b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=2.0))
+        self.assertEqual(b_event.hedge_event(event), [])
+
+    def test_default_wager_precision(self):
+        event = b_event.Event()
+        event.add_bets([
+            b_event.Bet(bet_type=b_event.BetType.Goals_OverUnder, value="over 2.5", odds=3.0, previous_wager=100),
+            b_event.Bet(bet_type=b_event.BetType.Goals_OverUnder, value="under 2.5", odds=1.5),
+        ])
+        hedge, = b_event.hedge_event(event)
+        self.assertEqual(hedge.wagers, [(event.bets[1], 200.0)])
+
+        event = b_event.Event()
+        event.add_bets([
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=2.0, previous_wager=100),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="draw", odds=4.0, volume=10),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="away", odds=4.0),
+        ])
+        hedge, = b_event.hedge_event(event)
+        self.assertEqual(dict((bet.value, wager) for bet, wager in hedge.wagers), {"draw": 10.0, "away": 10.0})
+
+    def test_many_positions(self):
+        bookmakers = [b_event.Bookmaker(commission=0.01 * i, wager_limit=500) for i in range(8)]
+        events = []
+        for i in range(3000):
+            event = b_event.Event(wager_precision=0.01)
+            bets = [
+                b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=2.0, previous_wager=100),
+                b_event.Bet(bet_type=b_event.BetType.BothTeamsToScore, value="yes", odds=1.9, previous_wager=50),
+            ]
+            for j, bookmaker in enumerate(bookmakers):
+                for value in ("home", "draw", "away"):
+                    bets.append(b_event.Bet(bet_type=b_event.BetType.MatchWinner, value=value, odds=2.5 + (i + j) % 7 * 0.1, volume=40, bookmaker=bookmaker))
+                for value in ("yes", "no"):
+                    bets.append(b_event.Bet(bet_type=b_event.BetType.BothTeamsToScore, value=value, odds=1.8 + (i * j) % 5 * 0.05, volume=30, bookmaker=bookmaker))
+            event.add_bets(bets)
+            events.append(event)
+
+        self.assertEqual(len(b_event.hedge_events(events)), 6000)
+        self.assertLess(min(timeit.repeat(lambda: b_event.hedge_events(events), number=1, repeat=3)), 1.0)
@@ -0,0 +1,125 @@
+import http.server
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+
+from betting_event.__main__ import main, normalise_odds
+
+
+EVENT = {
+    "bets": [
+        {"bet_type": 1, "value": "home", "odds": "6/4"},
+        {"bet_type": 1, "value": "draw", "odds": 3.4},
+        {"bet_type": 1, "value": "away", "odds": "+200"},
+    ]
+}
+
+
+class StandInCalculator(http.server.BaseHTTPRequestHandler):
+    def do_POST(self):
+        event = json.loads(self.rfile.read(int(self.headers["content-length"])))
+        for bet in event["bets"]:
+            bet["wager"] = 10.0
+        event["profit"] = [1.0, 1.0]
+        body = json.dumps(event).encode()
+        self.send_response(200)
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+class ForbiddenCalculator(http.server.BaseHTTPRequestHandler):
+    hosts = []
+
+    def do_POST(self):
+        self.hosts.append(self.headers["X-RapidAPI-Host"])
+        self.rfile.read(int(self.headers["content-length"]))
+        self.send_response(403)
+        self.send_header("content-length", "0")
+        self.end_headers()
+
+    def log_message(self, *_):
+        pass
+
+
+class TestMain(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.directory.name, "day.ndjson"), "w") as file:
+            file.write("\n".join(json.dumps(EVENT) for _ in range(5)) + "\n{not json}\n")
+        self.output_directory = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.output_directory.name, "out.ndjson")
+
+    def tearDown(self):
+        self.directory.cleanup()
+        self.output_directory.cleanup()
+
+    def run_main(self, *args):
+        with redirect_stderr(io.StringIO()):
+            code = main([self.directory.name, "-o", self.output, *args])
+        with open(self.output) as file:
+            return code, [json.loads(line) for line in file]
+
+    def test_normalise_odds(self):
+        self.assertEqual(normalise_odds("6/4"), 2.5)
+        self.assertEqual(normalise_odds("-200"), 1.5)
+        self.assertEqual(normalise_odds(2.5), 2.5)
+        self.assertEqual(normalise_odds(150, "american"), 2.5)
+
+    def test_ordered_output_with_errors(self):
+        for workers in ("1", "2"):
+            code, results = self.run_main("-j", workers, "--window", "2")
+            self.assertEqual(code, 1)
+            self.assertEqual([result["line"] for result in results], [1, 2, 3, 4, 5, 6])
+            self.assertEqual([bet["odds"] for bet in results[0]["event"]["bets"]], [2.5, 3.4, 3.0])
+            self.assertTrue(results[5]["error"].startswith("JSONDecodeError"))
+
+    def test_submit_to_endpoint(self):
+        server = http.server.HTTPServer(("127.0.0.1", 0), StandInCalculator)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            _, results = self.run_main("-j", "1", "--endpoint", f"http://127.0.0.1:{server.server_port}/MultiMarket")
+        finally:
+            server.shutdown()
+        self.assertEqual(results[0]["event"]["profit"], [1.0, 1.0])
+        self.assertEqual([bet["wager"] for bet in results[0]["event"]["bets"]], [10.0, 10.0, 10.0])
+
+    def test_output_inside_input_directory(self):
+        self.output = os.path.join(self.directory.name, "out.ndjson")
+        for _ in range(2):      # the second run must not read the first run's output
+            _, results = self.run_main("-j", "1")
+            self.assertEqual(len(results), 6)
+
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            main([self.output, "-o", self.output])
+
+    def test_endpoint_timeout(self):
+        server = http.server.HTTPServer(("127.0.0.1", 0), http.server.BaseHTTPRequestHandler)   # accepts, never replies
+        try:
+            _, results = self.run_main("-j", "1", "--timeout", "0.1", "--endpoint", f"http://127.0.0.1:{server.server_port}/")
+        finally:
+            server.server_close()
+        self.assertTrue(all("error" in result for result in results))
+
+    def test_rapidapi_error_response(self):
+        server = http.server.HTTPServer(("127.0.0.1", 0), ForbiddenCalculator)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        stdout = io.StringIO()
+        try:
+            with mock.patch("betting_event.__main__.RAPIDAPI_ENDPOINT", f"http://127.0.0.1:{server.server_port}/MultiMarket"), \
+                    redirect_stdout(stdout):
+                code, results = self.run_main("-j", "1", "--api-key", "key")
+        finally:
+            server.shutdown()
+        self.assertEqual(code, 1)
+        self.assertEqual(stdout.getvalue(), "")
+        self.assertTrue(all(result["error"].startswith(("HTTPError", "JSONDecodeError")) for result in results))
+        self.assertEqual(ForbiddenCalculator.hosts, [f"127.0.0.1:{server.server_port}"] * 5)
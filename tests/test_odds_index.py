@@ -0,0 +1,72 @@
+import unittest
+
+import betting_event as b_event
+
+
+class TestBestOddsIndex(unittest.TestCase):
+    def setUp(self):
+        self.betfair = b_event.Bookmaker(commission=0.05)
+        self.coral = b_event.Bookmaker()
+        self.bet365 = b_event.Bookmaker()
+
+        self.event = b_event.Event()
+        self.event.add_bets([
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=2.1, bookmaker=self.betfair),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=2.06, bookmaker=self.coral),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=1.9, bookmaker=self.bet365),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=3.0, bookmaker=self.bet365, lay=True),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="away", odds=3.5, bookmaker=self.coral),
+        ])
+        self.index = b_event.BestOddsIndex([self.event])
+
+    def test_best_after_commission(self):
+        best, runner_up = self.index.best(self.event, b_event.BetType.MatchWinner, "home")
+        self.assertIs(best.bookmaker, self.coral)           # 2.1 at 5% commission is 2.045
+        self.assertIs(runner_up.bookmaker, self.betfair)
+
+    def test_update_bet(self):
+        bet = self.event.bets[2]
+        bet.odds = 2.5
+        self.index.update_bet(bet)
+        best, runner_up = self.index.best(self.event, "MatchWinner", "home")
+        self.assertIs(best, bet)
+        self.assertIs(runner_up.bookmaker, self.coral)
+
+    def test_remove_bookmaker(self):
+        self.index.remove_bookmaker(self.coral)
+        best, runner_up = self.index.best(self.event, 1, "home")
+        self.assertIs(best.bookmaker, self.betfair)
+        self.assertIs(runner_up.bookmaker, self.bet365)
+        self.assertEqual(self.index.best(self.event, 1, "away"), (None, None))
+
+    def test_best_all(self):
+        result = self.index.best_all()[self.event]
+        self.assertEqual(set(result), {(b_event.BetType.MatchWinner, "home"), (b_event.BetType.MatchWinner, "away")})
+        self.assertIsNone(result[(b_event.BetType.MatchWinner, "away")][1])
+
+    def test_update_bookmaker(self):
+        self.event.add_bookmaker(b_event.Bookmaker.from_dict({"id": self.betfair._id, "commission": 0.0}))
+        self.index.update_bookmaker(self.betfair)
+        best, runner_up = self.index.best(self.event, 1, "home")
+        self.assertIs(best.bookmaker, self.betfair)
+        self.assertIs(runner_up.bookmaker, self.coral)
+
+    def test_add_event_picks_up_new_bets(self):
+        self.event.add_bet(b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="away", odds=4.0, bookmaker=self.betfair))
+        self.index.add_event(self.event)
+        best, runner_up = self.index.best(self.event, 1, "away")
+        self.assertEqual(best.odds, 4.0)
+        self.assertEqual(runner_up.odds, 3.5)
+
+    def test_remove_bookmaker_then_add_event(self):
+        self.index.remove_bookmaker(self.coral)
+        self.index.add_event(self.event)
+        self.index.update_bet(self.event.bets[1])
+        best, _ = self.index.best(self.event, 1, "home")
+        self.assertIs(best.bookmaker, self.betfair)
+        self.assertEqual(self.index.best(self.event, 1, "away"), (None, None))
+
+    def test_add_event_twice_keeps_heaps_small(self):
+        self.index.add_event(self.event)
+        heap = self.index._selections[(id(self.event), (b_event.BetType.MatchWinner, "home"))]
+        self.assertEqual(len(heap.heap), 3)
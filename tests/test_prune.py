@@ -0,0 +1,45 @@
+import unittest
+
+import betting_event as b_event
+
+
+class TestPruneEvent(unittest.TestCase):
+    def setUp(self):
+        self.betfair = b_event.Bookmaker(commission=0.05)
+        self.coral = b_event.Bookmaker()
+        self.limited = b_event.Bookmaker(max_wager_count=1)
+
+        self.event = b_event.Event(wager_limit=100)
+        self.event.add_bets([
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=2.2, bookmaker=self.coral),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=2.1, bookmaker=self.coral),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="home", odds=2.25, bookmaker=self.betfair),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="away", odds=3.0, bookmaker=self.betfair, volume=50),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="away", odds=2.9, bookmaker=self.coral, volume=0),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="away", odds=2.8, bookmaker=self.limited, previous_wager=10),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="draw", odds=3.2, bookmaker=self.limited),
+            b_event.Bet(bet_type=b_event.BetType.MatchWinner, value="draw", odds=3.1, bookmaker=self.coral),
+        ])
+
+    def test_removed(self):
+        pruned = b_event.prune_event(self.event)
+        reasons = {(bet.value, bet.odds): reason for bet, reason in pruned.removed}
+        self.assertEqual(reasons, {
+            ("home", 2.1): "duplicate",
+            ("home", 2.25): "dominated",        # 2.25 at 5% commission is 2.1875
+            ("away", 2.9): "volume",
+            ("draw", 3.2): "max_wager_count",
+        })
+        self.assertEqual(len(self.event.bets), 8)
+
+    def test_mapping(self):
+        pruned = b_event.prune_event(self.event)
+        self.assertEqual(len(pruned.event.bets), 4)
+        for pruned_bet, original in zip(pruned.event.bets, pruned.originals):
+            self.assertEqual(pruned_bet.as_dict(), original.as_dict())
+        self.assertEqual(pruned.event.wager_limit, 100)
+        self.assertEqual(len(pruned.event.bookmakers), 3)
+
+        pruned.event.bets[0].wager = 25
+        pruned.apply_wagers()
+        self.assertEqual(pruned.originals[0].wager, 25)